@@ -1,13 +1,74 @@
-import json
+import copy
 import os
+import random
 import time
-import socket
+from collections import OrderedDict
 from datetime import datetime, timezone
-from urllib.request import urlopen, Request
-from urllib.error import URLError
 from urllib.parse import quote
 
-from utils import sanitize_mc as _sanitize_mc
+import urllib3
+from urllib3.exceptions import HTTPError, MaxRetryError, NewConnectionError, TimeoutError as Urllib3TimeoutError
+
+from utils import json_loads, sanitize_mc as _sanitize_mc
+
+_UTC = timezone.utc
+
+# Shared across warm invocations so the TCP/TLS connection to FMCSA is reused.
+_POOL = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=4,
+    retries=False,
+    timeout=urllib3.Timeout(connect=3.0, read=28.0),
+)
+
+# Keep the full FMCSA payload under `raw` only when asked; it dominates item size.
+FMCSA_INCLUDE_RAW = os.getenv("FMCSA_INCLUDE_RAW", "0") == "1"
+
+# Retry sleeps are capped and jittered so retries never pile up or outlast the
+# API Gateway window.
+MAX_BACKOFF = int(os.getenv("FMCSA_BACKOFF_MAX", "4"))
+JITTER = 0.5
+
+# Warm-container cache of verify responses that returned a carrier record,
+# keyed by (base URL, sanitized MC).
+_FMCSA_CACHE: "OrderedDict[tuple[str, str], tuple[float, dict]]" = OrderedDict()
+_FMCSA_TTL = int(os.getenv("FMCSA_CACHE_TTL", "300"))
+_FMCSA_CACHE_MAX = 512
+
+
+def _cache_get(key: tuple[str, str], now: str) -> dict | None:
+    """Return a copy of a fresh cached response (with `checked_at=now`), else None."""
+    entry = _FMCSA_CACHE.get(key)
+    if not entry:
+        return None
+    ts, result = entry
+    if time.time() - ts >= _FMCSA_TTL:
+        _FMCSA_CACHE.pop(key, None)
+        return None
+    _FMCSA_CACHE.move_to_end(key)
+    hit = copy.deepcopy(result)
+    hit["checked_at"] = now
+    hit["cached"] = True
+    return hit
+
+
+def _cache_put(key: tuple[str, str], result: dict) -> None:
+    """Insert a response, evicting the least recently used entry when full."""
+    _FMCSA_CACHE[key] = (time.time(), copy.deepcopy(result))
+    _FMCSA_CACHE.move_to_end(key)
+    while len(_FMCSA_CACHE) > _FMCSA_CACHE_MAX:
+        _FMCSA_CACHE.popitem(last=False)
+
+
+def _is_timeout(e: Exception) -> bool:
+    """True for urllib3 timeouts, including ones wrapped in `MaxRetryError`.
+
+    `NewConnectionError` (refused, DNS failure) subclasses `ConnectTimeoutError`
+    but is not a timeout, so it is excluded.
+    """
+    if isinstance(e, MaxRetryError):
+        e = e.reason
+    return isinstance(e, Urllib3TimeoutError) and not isinstance(e, NewConnectionError)
 
 
 class FmcsaClient:
@@ -18,7 +79,10 @@ class FmcsaClient:
       - FMCSA_BASE_URL (default: https://mobile.fmcsa.dot.gov/qc/services)
       - FMCSA_MAX_RETRIES (default: 0)
       - FMCSA_BACKOFF_SECONDS (default: 0.75)
-      - FMCSA_TIMEOUT_SECONDS (default: 28)
+      - FMCSA_TIMEOUT_SECONDS (default: 28) — also the overall retry deadline
+      - FMCSA_BACKOFF_MAX (default: 4) — cap on a single retry sleep, in seconds
+      - FMCSA_INCLUDE_RAW (default: 0) — set to 1 to keep the full payload as `raw`
+      - FMCSA_CACHE_TTL (default: 300) — seconds a verify response is reused
     """
 
     def __init__(
@@ -35,26 +99,53 @@ class FmcsaClient:
         self.backoff = float(os.getenv("FMCSA_BACKOFF_SECONDS", str(backoff_seconds if backoff_seconds is not None else 0.75)))
         self.timeout = int(os.getenv("FMCSA_TIMEOUT_SECONDS", str(timeout_seconds if timeout_seconds is not None else 28)))
 
-    def verify(self, mc: str) -> dict:
+    def verify(self, mc: str, now_iso: str | None = None) -> dict:
         """Verify a carrier via `/carriers/{mc}?webKey=...` and normalize fields.
 
         Returns dict with keys: valid, allowed_to_operate, dot_number, carrier_name,
-        endpoint (redacted webKey), checked_at, raw?, error?
+        endpoint (redacted webKey), checked_at, cached, raw?, error?
+
+        Lookups that return a carrier record are cached per base URL and
+        sanitized MC for `FMCSA_CACHE_TTL` seconds within a warm container;
+        hits are returned with `cached=True`. Not-found and error responses
+        are never cached.
+
+        `now_iso` stamps `checked_at`; defaults to the current UTC time.
         """
-        now = datetime.now(timezone.utc).isoformat()
+        now = now_iso or datetime.now(_UTC).isoformat()
         mc_clean = _sanitize_mc(mc)
         if not self.webkey or not mc_clean:
             return {"valid": False, "error": "missing_webkey_or_mc", "checked_at": now}
 
+        cache_key = (self.base_url, mc_clean)
+        hit = _cache_get(cache_key, now)
+        if hit is not None:
+            return hit
+
         url = f"{self.base_url}/carriers/{quote(mc_clean)}?webKey={quote(self.webkey)}"
 
+        deadline = time.monotonic() + self.timeout
         last_err = None
         for attempt in range(self.max_retries + 1):
+            # Each attempt only gets what is left of the overall deadline.
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
             try:
-                req = Request(url, headers={"Accept": "application/json"})
-                with urlopen(req, timeout=self.timeout) as resp:
-                    payload = resp.read().decode("utf-8", "ignore")
-                data = json.loads(payload or "{}")
+                resp = _POOL.request(
+                    "GET",
+                    url,
+                    headers={"Accept": "application/json"},
+                    timeout=urllib3.Timeout(connect=min(3.0, remaining), read=remaining),
+                )
+                if resp.status >= 400:
+                    return {
+                        "valid": False,
+                        "endpoint": url.replace(self.webkey, "****"),
+                        "checked_at": now,
+                        "error": f"HTTP Error {resp.status}: {resp.reason}",
+                    }
+                data = json_loads(resp.data or b"{}")
                 content = data.get("content") if isinstance(data, dict) else None
 
                 allowed = None
@@ -68,21 +159,23 @@ class FmcsaClient:
                     legal = source.get("legalName")
 
                 is_valid = str(allowed).upper() == "Y"
-                return {
+                result = {
                     "valid": bool(is_valid),
                     "allowed_to_operate": allowed,
                     "dot_number": dot,
                     "carrier_name": legal,
                     "endpoint": url.replace(self.webkey, "****"),
                     "checked_at": now,
-                    "raw": data,
+                    "cached": False,
                     "error": None if content else (data.get("content") or "not_found"),
                 }
-            except socket.timeout as e:
-                last_err = e
-            except URLError as e:
-                reason_text = str(getattr(e, "reason", e))
-                if "timed out" in reason_text.lower():
+                if FMCSA_INCLUDE_RAW:
+                    result["raw"] = data
+                if content:
+                    _cache_put(cache_key, result)
+                return result
+            except HTTPError as e:
+                if _is_timeout(e):
                     last_err = e
                 else:
                     return {
@@ -100,7 +193,10 @@ class FmcsaClient:
                 }
 
             if attempt < self.max_retries:
-                time.sleep(self.backoff * (2 ** attempt))
+                delay = min(self.backoff * (2 ** attempt), MAX_BACKOFF) * (1 + random.uniform(0, JITTER))
+                if time.monotonic() + delay > deadline:
+                    break
+                time.sleep(delay)
                 continue
             break
 
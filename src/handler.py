@@ -1,23 +1,32 @@
-import json, uuid
-import re
+import atexit
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 from repos.load_repo import LoadRepository
 from repos.result_repo import ResultRepository
 from services.matching_service import match_loads
-from clients.fmcsa_client import FmcsaClient
-from utils import json_default as _utils_json_default, date_only as _utils_date_only, sanitize_mc as _utils_sanitize_mc
+from clients.fmcsa_client import _POOL, FmcsaClient
+from utils import json_dumps, json_loads, sanitize_mc
 
-# Required fields for creating a new request (POST without request_id)
-REQUIRED = [
+_UTC = timezone.utc
+
+logger = logging.getLogger(__name__)
+
+# Required fields for creating a new request (POST without request_id).
+# The tuple fixes the order validation errors are reported in.
+REQUIRED_TUPLE = (
     "mc_number",
     "origin",
     "destination",
     "pickup_datetime",
     "equipment_type",
-]
+)
+REQUIRED = frozenset(REQUIRED_TUPLE)
 
 # Optional fields for post-intake updates (via PUT, or legacy POST with request_id)
-OPTIONAL = [
+OPTIONAL = frozenset({
     "delivery_datetime",
     "carrier_name",
     "rate_offer",
@@ -25,54 +34,65 @@ OPTIONAL = [
     "accepted_offer",
     "outcome",
     "sentiment",
-]
+})
 
-def _json_default(o):
-    """Delegate to `utils.json_default` for JSON-safe serialization."""
-    return _utils_json_default(o)
+# Static across responses; shared rather than rebuilt per call.
+_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,X-API-Key",
+    "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT",
+}
+
+# Pre-encoded bodies for the most common fixed responses.
+_BODY_OK = json_dumps({"ok": True})
+_BODY_NOT_FOUND = json_dumps({"ok": False, "error": "Not found"})
 
 
 def _resp(status, body):
     """
     Build an API Gateway/Lambda proxy response.
+    A `str` body is treated as already-encoded JSON.
     """
     return {
         "statusCode": status,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type,X-API-Key",
-            "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT",
-        },
-        "body": json.dumps(body, default=_json_default)
+        "headers": _HEADERS,
+        "body": body if isinstance(body, str) else json_dumps(body)
     }
 
 RESULT_REPO = ResultRepository()
 
+# Module-level so worker threads survive warm invocations.
+_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+atexit.register(lambda: _EXECUTOR.shutdown(wait=True))
 
-def _sanitize_mc(mc: str) -> str:
-    """Delegate to `utils.sanitize_mc` for MC normalization."""
-    return _utils_sanitize_mc(mc)
+# How long the create path waits on a background save before responding.
+_SAVE_GRACE_SECONDS = 0.05
 
+# In-flight background saves by request_id; an entry drops once its save finishes.
+_PENDING_SAVES: dict = {}
 
-def _fetch_loads(intake: dict):
+
+def _fetch_loads(intake: dict, now_iso: str | None = None):
     """Thin wrapper: read loads and apply matching service (limit 3)."""
-    loads = LoadRepository().list()
-    return match_loads(intake, loads, limit=3)
+    repo = LoadRepository()
+    return match_loads(intake, repo.list(), limit=3, prepared=repo.prepared(), now_iso=now_iso)
 
 
-def _compute_result(intake: dict, request_id: str):
+def _compute_result(intake: dict, request_id: str, now_iso: str):
     """
     Compute the composite result for a new intake.
 
-    Runs FMCSA verification and local load matching, then packages a
-    response shape that can be saved and summarized.
+    Runs FMCSA verification (in a worker thread) concurrently with local
+    load matching, then packages a response shape that can be saved and
+    summarized. All timestamps in the result share `now_iso`.
     """
-    fmcsa = FmcsaClient().verify(intake["mc_number"])
-    loads = _fetch_loads(intake)
+    fmcsa_future = _EXECUTOR.submit(FmcsaClient().verify, intake["mc_number"], now_iso)
+    loads = _fetch_loads(intake, now_iso)
+    fmcsa = fmcsa_future.result()
     return {
         "request_id": request_id,
-        "received_at": datetime.now(timezone.utc).isoformat(),
+        "received_at": now_iso,
         "intake": intake,
         "fmcsa": fmcsa,
         "loads": loads,
@@ -80,9 +100,85 @@ def _compute_result(intake: dict, request_id: str):
     }
 
 
+def _warm() -> None:
+    """Touch the container-level caches so a scheduled ping keeps them initialized."""
+    wait(list(_PENDING_SAVES.values()))
+    _POOL.connection_from_url(FmcsaClient().base_url)
+    LoadRepository().list()
+    RESULT_REPO.prime()
+
+
+def _on_save_done(request_id: str, future) -> None:
+    """Drop a finished save from `_PENDING_SAVES`, logging it if it failed."""
+    _PENDING_SAVES.pop(request_id, None)
+    try:
+        saved = future.result()
+    except Exception:
+        logger.exception("Background save failed for %s", request_id)
+        return
+    if not saved and RESULT_REPO.table_name:
+        logger.error("Failed to save result %s", request_id)
+
+
+def _save_result(request_id: str, result: dict) -> None:
+    """
+    Persist a new result off the response path (write-behind).
+
+    The save runs on `_EXECUTOR`; we wait briefly so it usually completes
+    in-invocation, otherwise it finishes when the container next thaws.
+    Until then the future stays in `_PENDING_SAVES` so an update for the
+    same request_id can wait on it. Failed saves are logged. Set
+    `SYNC_SAVE=1` (the template default) to save synchronously.
+    """
+    if os.getenv("SYNC_SAVE") == "1":
+        if not RESULT_REPO.save(request_id, result) and RESULT_REPO.table_name:
+            logger.error("Failed to save result %s", request_id)
+        return
+    # Client setup happens here, not in the worker, so a cold container's
+    # save is not left waiting on the boto3 import when Lambda freezes it.
+    RESULT_REPO.prime()
+    future = _EXECUTOR.submit(RESULT_REPO.save, request_id, result)
+    _PENDING_SAVES[request_id] = future
+    future.add_done_callback(lambda f: _on_save_done(request_id, f))
+    # Failures are reported by `_on_save_done`, not raised into the response.
+    wait([future], timeout=_SAVE_GRACE_SECONDS)
+
+
+def _update_result(body: dict, now_iso: str):
+    """
+    Merge provided OPTIONAL fields into a saved result's `intake`.
+
+    Writes only the changed attributes; a missing record surfaces as 404
+    from the repository's existence condition rather than a prior read.
+    A background save still pending in this container is waited on first.
+    """
+    req_id = str(body.get("request_id") or "").strip()
+    if not req_id:
+        return _resp(400, {"ok": False, "error": "Invalid request_id"})
+
+    # Collect provided optional fields to merge under result.intake
+    updates = {k: body[k] for k in OPTIONAL & body.keys()}
+    if not updates:
+        return _resp(400, {"ok": False, "error": "No updatable fields provided"})
+
+    pending = _PENDING_SAVES.get(req_id)
+    if pending is not None:
+        wait([pending])
+
+    saved = RESULT_REPO.update(req_id, updates, now_iso)
+    if saved is None:
+        return _resp(404, _BODY_NOT_FOUND)
+    if not saved:
+        return _resp(500, {"ok": False, "error": "Failed to save update"})
+    return _resp(200, {"ok": True, "request_id": req_id, "updated_at": now_iso})
+
+
 def lambda_handler(event, context):
     """AWS Lambda entry point (API Gateway proxy integration compatible).
 
+    Scheduled warmup pings (`{"warmup": true}`) return immediately after
+    touching the module caches.
+
     Supports four flows:
     1) CORS preflight (OPTIONS): returns 200 with headers.
     2) GET /{request_id} or ?request_id=... : fetch previously saved result.
@@ -97,9 +193,14 @@ def lambda_handler(event, context):
     • PUT update -> { ok: True, request_id, updated_at }
     • Errors -> { ok: False, error: "..." [, errors: {field: reason} ] }
     """
+    if event.get("warmup"):
+        _warm()
+        return {"statusCode": 200, "body": "warm"}
+
+    now_iso = datetime.now(_UTC).isoformat()
     method = (event.get("httpMethod") or "").upper()
     if method == "OPTIONS":
-        return _resp(200, {"ok": True})
+        return _resp(200, _BODY_OK)
 
     if method == "GET":
         path_params = event.get("pathParameters") or {}
@@ -109,88 +210,50 @@ def lambda_handler(event, context):
             return _resp(400, {"ok": False, "error": "Missing request_id"})
         item = RESULT_REPO.get(req_id)
         if not item:
-            return _resp(404, {"ok": False, "error": "Not found"})
+            return _resp(404, _BODY_NOT_FOUND)
         return _resp(200, {"ok": True, "result": item})
 
     # PUT: update/enrichment flow (same semantics as legacy POST-with-request_id)
     if method == "PUT":
         try:
-            body = json.loads(event.get("body") or "{}")
-        except json.JSONDecodeError:
+            body = json_loads(event.get("body") or "{}")
+        except ValueError:
             return _resp(400, {"ok": False, "error": "Invalid JSON"})
 
-        req_id = str(body.get("request_id") or "").strip()
-        if not req_id:
-            return _resp(400, {"ok": False, "error": "Invalid request_id"})
-        existing = RESULT_REPO.get(req_id)
-        if not existing:
-            return _resp(404, {"ok": False, "error": "Not found"})
-
-        # Collect provided optional fields to merge under result.intake
-        updates = {k: body[k] for k in OPTIONAL if k in body}
-        if not updates:
-            return _resp(400, {"ok": False, "error": "No updatable fields provided"})
-
-        existing_intake = existing.get("intake") or {}
-        existing_intake.update(updates)
-        existing["intake"] = existing_intake
-        existing["updated_at"] = datetime.now(timezone.utc).isoformat()
-
-        if not RESULT_REPO.save(req_id, existing):
-            return _resp(500, {"ok": False, "error": "Failed to save update"})
-        return _resp(200, {"ok": True, "request_id": req_id, "updated_at": existing["updated_at"]})
+        return _update_result(body, now_iso)
 
     # Default to POST
     try:
-        body = json.loads(event.get("body") or "{}")
-    except json.JSONDecodeError:
+        body = json_loads(event.get("body") or "{}")
+    except ValueError:
         return _resp(400, {"ok": False, "error": "Invalid JSON"})
 
     # Option B: If a request_id is provided, treat this POST as an update/enrichment
     if "request_id" in body:
-        req_id = str(body.get("request_id") or "").strip()
-        if not req_id:
-            return _resp(400, {"ok": False, "error": "Invalid request_id"})
-        existing = RESULT_REPO.get(req_id)
-        if not existing:
-            return _resp(404, {"ok": False, "error": "Not found"})
-
-        # Collect provided optional fields to merge under result.intake
-        updates = {k: body[k] for k in OPTIONAL if k in body}
-        if not updates:
-            return _resp(400, {"ok": False, "error": "No updatable fields provided"})
-
-        existing_intake = existing.get("intake") or {}
-        existing_intake.update(updates)
-        existing["intake"] = existing_intake
-        existing["updated_at"] = datetime.now(timezone.utc).isoformat()
-
-        if not RESULT_REPO.save(req_id, existing):
-            return _resp(500, {"ok": False, "error": "Failed to save update"})
-        return _resp(200, {"ok": True, "request_id": req_id, "updated_at": existing["updated_at"]})
+        return _update_result(body, now_iso)
 
     # Otherwise, create a new record (original flow)
     # Build per-field validation errors using a single generic message
-    errors = {}
-    for k in REQUIRED:
-        v = body.get(k)
-        if v is None or (isinstance(v, str) and not v.strip()):
-            errors[k] = "This field is missing or incorrect"
+    errors = {
+        k: "This field is missing or incorrect"
+        for k in REQUIRED_TUPLE
+        if body.get(k) is None or (isinstance(body[k], str) and not body[k].strip())
+    }
     if errors:
         return _resp(400, {"ok": False, "error": "validation_error", "errors": errors})
 
     request_id = str(uuid.uuid4())
 
     intake = {
-        "mc_number": _sanitize_mc(body["mc_number"]),
+        "mc_number": sanitize_mc(body["mc_number"]),
         "origin": str(body["origin"]).strip(),
         "destination": str(body["destination"]).strip(),
         "pickup_datetime": str(body["pickup_datetime"]).strip(),
         "equipment_type": str(body["equipment_type"]).strip(),
     }
 
-    result = _compute_result(intake, request_id)
-    RESULT_REPO.save(request_id, result)
+    result = _compute_result(intake, request_id, now_iso)
+    _save_result(request_id, result)
 
     return _resp(200, {
         "ok": True,
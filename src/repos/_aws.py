@@ -0,0 +1,28 @@
+# One low-level DynamoDB client per container, shared by every repository and
+# reused across warm invocations (keeps the HTTPS connection pool alive).
+_DDB_CLIENT = None
+
+
+def _ddb_config():
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=10,
+        retries={"max_attempts": 2, "mode": "standard"},
+        tcp_keepalive=True,
+    )
+
+
+def get_ddb_client():
+    """Return the process-wide low-level DynamoDB client, creating it on first use.
+
+    boto3 is imported here rather than at module top so code paths that never
+    touch DynamoDB don't pay for the import. The client takes and returns
+    typed attribute values; callers (de)serialize them.
+    """
+    global _DDB_CLIENT
+    if _DDB_CLIENT is None:
+        import boto3
+
+        _DDB_CLIENT = boto3.client("dynamodb", config=_ddb_config())
+    return _DDB_CLIENT
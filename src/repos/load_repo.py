@@ -1,26 +1,52 @@
-import json
 import os
 from functools import lru_cache
 from typing import List, Dict
 
+from services.matching_service import PreparedLoads, prepare_loads
+from utils import json_loads
 
-@lru_cache(maxsize=1)
-def _load_json(path: str) -> list:
+# default path: <project_root>/src/data/fake_loads.json
+_DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "fake_loads.json")
+
+
+def _read_loads(path: str) -> list:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(path, "rb") as f:
+            data = json_loads(f.read())
             return data if isinstance(data, list) else []
     except Exception:
         return []
 
 
+# Parsed and indexed at import so the cost lands in the Lambda INIT phase
+# rather than on the first request.
+_LOADS = _read_loads(_DEFAULT_PATH)
+_PREPARED = prepare_loads(_LOADS)
+
+
+@lru_cache(maxsize=1)
+def _load_json(path: str) -> list:
+    return _read_loads(path)
+
+
+@lru_cache(maxsize=1)
+def _load_prepared(path: str) -> PreparedLoads:
+    return prepare_loads(_load_json(path))
+
+
 class LoadRepository:
     """Repository for reading demo loads from local JSON."""
 
     def __init__(self, path: str | None = None) -> None:
-        # default path: <project_root>/src/data/fake_loads.json
-        default_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "fake_loads.json")
-        self.path = path or default_path
+        self.path = path or _DEFAULT_PATH
 
     def list(self) -> List[Dict]:
+        if self.path == _DEFAULT_PATH:
+            return _LOADS
         return _load_json(self.path)
+
+    def prepared(self) -> PreparedLoads:
+        """Normalized, match-indexed view of `list()`, computed once per path."""
+        if self.path == _DEFAULT_PATH:
+            return _PREPARED
+        return _load_prepared(self.path)
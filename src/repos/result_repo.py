@@ -1,9 +1,43 @@
+import json
 import os
 import time
+from decimal import Decimal
 from typing import Optional, Dict, Any
 
-import boto3
-from botocore.exceptions import BotoCoreError, ClientError
+from repos._aws import get_ddb_client
+from utils import json_default, json_dumps
+
+_SER = None
+_DESER = None
+
+
+def _serializer():
+    """Shared `TypeSerializer`, created on first write."""
+    global _SER
+    if _SER is None:
+        from boto3.dynamodb.types import TypeSerializer
+
+        _SER = TypeSerializer()
+    return _SER
+
+
+def _deserializer():
+    """Shared deserializer that yields native ints/floats, created on first read."""
+    global _DESER
+    if _DESER is None:
+        from boto3.dynamodb.types import TypeDeserializer
+
+        class _NativeNumberDeserializer(TypeDeserializer):
+            def _deserialize_n(self, value):
+                return json_default(super()._deserialize_n(value))
+
+        _DESER = _NativeNumberDeserializer()
+    return _DESER
+
+
+def _to_ddb(value: Any) -> Any:
+    """Convert floats (anywhere in `value`) to Decimal in a single JSON round-trip."""
+    return json.loads(json_dumps(value), parse_float=Decimal)
 
 
 class ResultRepository:
@@ -11,33 +45,96 @@ class ResultRepository:
 
     def __init__(self, table_name: Optional[str] = None) -> None:
         self.table_name = table_name or os.getenv("RESULTS_TABLE", "").strip()
-        self._table = None
-        if self.table_name:
-            try:
-                self._table = boto3.resource("dynamodb").Table(self.table_name)
-            except Exception:
-                self._table = None
+
+    def prime(self) -> None:
+        """Build the DynamoDB client and serializer now, if a table is configured.
+
+        Lets a caller pay the boto3 import and client setup up front (e.g. on
+        its own thread) instead of inside a later `save`.
+        """
+        if not self.table_name:
+            return
+        try:
+            get_ddb_client()
+            _serializer()
+        except Exception:
+            # Surfaces again, and is reported, from the next save/get/update.
+            pass
 
     def save(self, request_id: str, result: Dict[str, Any]) -> bool:
         """Save a result document with TTL and request_id."""
-        if not self._table:
+        if not self.table_name:
             return False
+        from botocore.exceptions import BotoCoreError, ClientError
+
         ttl_seconds = int(os.getenv("RESULT_TTL_SECONDS", "86400"))  # default 1 day
-        item = dict(result)
+        item = _to_ddb(result)
         item["request_id"] = request_id
         item["ttl"] = int(time.time()) + ttl_seconds
+        ser = _serializer()
         try:
-            self._table.put_item(Item=item)
+            get_ddb_client().put_item(
+                TableName=self.table_name,
+                Item={k: ser.serialize(v) for k, v in item.items()},
+            )
             return True
         except (BotoCoreError, ClientError):
             return False
 
+    def update(self, request_id: str, updates: Dict[str, Any], now_iso: str) -> Optional[bool]:
+        """Set `intake.<field>` for each update plus `updated_at`, refreshing TTL.
+
+        Returns True on success, False on a write failure, and None when no
+        result exists for `request_id` (or no table is configured).
+        """
+        if not self.table_name:
+            return None
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        ttl_seconds = int(os.getenv("RESULT_TTL_SECONDS", "86400"))
+        fields = list(updates.items())
+        sets = [f"intake.#f{i} = :v{i}" for i in range(len(fields))]
+        names = {f"#f{i}": k for i, (k, _) in enumerate(fields)}
+        values = {f":v{i}": v for i, v in enumerate(_to_ddb([v for _, v in fields]))}
+        values[":u"] = now_iso
+        values[":t"] = int(time.time()) + ttl_seconds
+        ser = _serializer()
+        try:
+            get_ddb_client().update_item(
+                TableName=self.table_name,
+                Key={"request_id": {"S": request_id}},
+                UpdateExpression="SET " + ", ".join(sets + ["updated_at = :u", "#ttl = :t"]),
+                ExpressionAttributeNames={**names, "#ttl": "ttl"},
+                ExpressionAttributeValues={k: ser.serialize(v) for k, v in values.items()},
+                ConditionExpression="attribute_exists(request_id)",
+            )
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                return None
+            return False
+        except BotoCoreError:
+            return False
+
     def get(self, request_id: str) -> Optional[Dict[str, Any]]:
-        """Fetch a previously saved result by request_id."""
-        if not self._table:
+        """Fetch a previously saved result by request_id.
+
+        Numbers come back as int/float rather than Decimal, so the item is
+        JSON-ready without per-value conversion.
+        """
+        if not self.table_name:
             return None
+        from botocore.exceptions import BotoCoreError, ClientError
+
         try:
-            resp = self._table.get_item(Key={"request_id": request_id})
-            return resp.get("Item")
+            resp = get_ddb_client().get_item(
+                TableName=self.table_name,
+                Key={"request_id": {"S": request_id}},
+            )
         except (BotoCoreError, ClientError):
             return None
+        item = resp.get("Item")
+        if item is None:
+            return None
+        deser = _deserializer()
+        return {k: deser.deserialize(v) for k, v in item.items()}
@@ -1,10 +1,84 @@
 from datetime import datetime, timezone
-from typing import List, Dict
+from typing import List, Dict, NamedTuple, Optional, Tuple
 
 from utils import date_only
 
+# (pickup_date_iso, origin_lc, dest_lc, equipment_lc)
+MatchKey = Tuple[str, str, str, str]
 
-def match_loads(intake: dict, loads: List[Dict], limit: int = 3) -> dict:
+# Every match satisfies all four rules, so score and reasons are shared.
+_MATCH_SCORE = 4
+_MATCH_REASONS = (
+    "Origin exact",
+    "Destination exact",
+    "Pickup date exact",
+    "Equipment exact",
+)
+
+_UTC = timezone.utc
+
+
+def _norm(s) -> str:
+    """Case- and whitespace-insensitive form of a match field (`None` -> "")."""
+    return (s or "").strip().lower()
+
+
+class Load(NamedTuple):
+    """A load with its match fields normalized at ingest; `raw` is the original dict."""
+    origin_lc: str
+    dest_lc: str
+    equipment_lc: str
+    pickup_date_iso: Optional[str]
+    raw: Dict
+
+
+class PreparedLoads(NamedTuple):
+    """Exact-match index over `Load` records.
+
+    `by_key` maps each normalized `MatchKey` to the records (in load order)
+    with exactly those fields, so an exact match is one dict lookup.
+    Loads missing any of the four fields are left out: they can never match.
+    """
+    by_key: Dict[MatchKey, Tuple[Load, ...]]
+
+
+def prepare_loads(loads: List[Dict]) -> PreparedLoads:
+    """
+    Normalize every load once (lowercase/strip, ISO pickup date) and index by match key.
+
+    Meant to run once at startup; `LoadRepository` does so at import. The load
+    dicts themselves are left untouched so matches copy only the original
+    fields into the response.
+    """
+    records = (
+        Load(
+            origin_lc=_norm(load.get("origin")),
+            dest_lc=_norm(load.get("destination")),
+            equipment_lc=_norm(load.get("equipment_type")),
+            pickup_date_iso=date_only(load.get("pickup_date")),
+            raw=load,
+        )
+        for load in loads
+    )
+
+    buckets: Dict[MatchKey, List[Load]] = {}
+    for rec in records:
+        key = (rec.pickup_date_iso, rec.origin_lc, rec.dest_lc, rec.equipment_lc)
+        if all(key):
+            buckets.setdefault(key, []).append(rec)
+    # Frozen: the index is shared by every request in a warm container.
+    by_key = {key: tuple(recs) for key, recs in buckets.items()}
+
+    return PreparedLoads(by_key)
+
+
+def match_loads(
+    intake: dict,
+    loads: List[Dict],
+    limit: int = 3,
+    prepared: Optional[PreparedLoads] = None,
+    now_iso: Optional[str] = None,
+) -> dict:
     """
     Exact-match filtering over provided loads.
 
@@ -12,45 +86,36 @@ def match_loads(intake: dict, loads: List[Dict], limit: int = 3) -> dict:
     - origin, destination, equipment_type: exact (case-insensitive) equality
     - pickup_date: same day via date_only() on intake["pickup_datetime"] vs load["pickup_date"]
 
+    `prepared` is the precomputed `prepare_loads(loads)`; it is built on the fly
+    when not supplied. `now_iso` stamps `checked_at` (defaults to now, UTC).
+
     Returns a dict shaped like the current API expects.
     """
-    origin = (intake.get("origin") or "").strip().lower()
-    dest = (intake.get("destination") or "").strip().lower()
-    equipment = (intake.get("equipment_type") or "").strip().lower()
+    origin = _norm(intake.get("origin"))
+    dest = _norm(intake.get("destination"))
+    equipment = _norm(intake.get("equipment_type"))
     pickup_date = date_only(intake.get("pickup_datetime"))
 
-    matches: List[Dict] = []
-    for load in loads:
-        load_origin = (load.get("origin") or "").strip().lower()
-        load_dest = (load.get("destination") or "").strip().lower()
-        load_equipment = (load.get("equipment_type") or "").strip().lower()
-        load_pickup_date = date_only(load.get("pickup_date"))
-
-        if not pickup_date or load_pickup_date != pickup_date:
-            continue
-        if not origin or load_origin != origin:
-            continue
-        if not dest or load_dest != dest:
-            continue
-        if not equipment or load_equipment != equipment:
-            continue
-
-        m = dict(load)
-        m["match_score"] = 4
-        m["match_reasons"] = [
-            "Origin exact",
-            "Destination exact",
-            "Pickup date exact",
-            "Equipment exact",
+    if not (origin and dest and equipment and pickup_date):
+        # An empty intake field can never match; skip indexing and lookup.
+        matches: List[Dict] = []
+    else:
+        if prepared is None:
+            prepared = prepare_loads(loads)
+        # All matches tie on _MATCH_SCORE, so file order is already the ranking.
+        # Reintroduce a sort (key=operator.itemgetter("match_score")) if scores vary.
+        # Truncate first so only the returned loads are copied.
+        hits = prepared.by_key.get((pickup_date, origin, dest, equipment), ())[:limit]
+        matches = [
+            {**rec.raw, "match_score": _MATCH_SCORE, "match_reasons": _MATCH_REASONS}
+            for rec in hits
         ]
-        matches.append(m)
-
-    matches.sort(key=lambda x: x.get("match_score", 0), reverse=True)
+    checked_at = now_iso or datetime.now(_UTC).isoformat()
 
     return {
-        "matches": matches[:limit],
+        "matches": matches,
         "source": "fake_loads_file",
         "status": "ready",
-        "checked_at": datetime.now(timezone.utc).isoformat(),
+        "checked_at": checked_at,
         "total_available": len(loads),
     }
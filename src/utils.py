@@ -1,6 +1,15 @@
-import re
+import json
 from datetime import datetime
 from decimal import Decimal
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # not bundled (e.g. plain `sam build` of src/); use stdlib json
+    orjson = None
+
+# Every byte except ASCII 0-9; non-ASCII characters are dropped by encoding first.
+_NON_DIGIT_BYTES = bytes(c for c in range(256) if not 48 <= c <= 57)
 
 
 def json_default(o):
@@ -9,25 +18,71 @@ def json_default(o):
     unknown types. This makes DynamoDB's Decimal values JSON‑safe in responses.
     """
     if isinstance(o, Decimal):
-        return int(o) if o % 1 == 0 else float(o)
+        # Integrality via rounding rather than `o % 1`, which runs a full
+        # arbitrary-precision remainder.
+        return int(o) if o == o.to_integral_value() else float(o)
     return str(o)
 
 
+def json_dumps(obj) -> str:
+    """
+    Serialize to a JSON string, using orjson when available.
+    Unknown types (e.g. Decimal) go through `json_default` either way.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, default=json_default)
+
+
+def json_loads(data):
+    """
+    Parse JSON from `str` or `bytes`, using orjson when available.
+    Raises `ValueError` (both libraries' decode errors subclass it) on bad input.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def date_only(s):
     """
     Extract an ISO date (`YYYY-MM-DD`) from inputs.
-    Tries `datetime.fromisoformat` first; falls back to regex search.
+    Tries `datetime.fromisoformat` first; falls back to scanning for the first
+    `YYYY-MM-DD` substring.
     Returns `None` if no reasonable date is found.
+    Inputs already shaped `YYYY-MM-DD` are returned as-is without parsing;
+    other results are memoized per input string.
     """
+    if s is None:
+        return None
+    if (isinstance(s, str) and len(s) == 10 and s[4] == "-" and s[7] == "-"
+            and s[:4].isdecimal() and s[5:7].isdecimal() and s[8:10].isdecimal()):
+        return s
+    return _date_only_cached(s if isinstance(s, str) else str(s))
+
+
+@lru_cache(maxsize=4096)
+def _date_only_cached(s: str) -> str | None:
     try:
-        return datetime.fromisoformat(str(s).replace("Z", "")).date().isoformat()
+        return datetime.fromisoformat(s.replace("Z", "")).date().isoformat()
     except Exception:
-        m = re.search(r"(\d{4}-\d{2}-\d{2})", str(s or ""))
-        return m.group(1) if m else None
+        return _find_iso_date(s)
+
+
+def _find_iso_date(s: str) -> str | None:
+    """First `dddd-dd-dd` substring of `s` (digits per `str.isdecimal`, like regex `\\d`)."""
+    for i in range(len(s) - 9):
+        if (s[i + 4] == "-" and s[i + 7] == "-"
+                and s[i:i + 4].isdecimal() and s[i + 5:i + 7].isdecimal() and s[i + 8:i + 10].isdecimal()):
+            return s[i:i + 10]
+    return None
 
 
 def sanitize_mc(mc: str) -> str:
     """
     Normalize an MC number by removing all non‑digits.
     """
-    return re.sub(r"[^0-9]", "", str(mc or ""))
+    s = str(mc or "")
+    if s.isascii() and s.isdigit():
+        return s
+    return s.encode("ascii", "ignore").translate(None, _NON_DIGIT_BYTES).decode("ascii")